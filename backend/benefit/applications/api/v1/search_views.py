@@ -1,8 +1,13 @@
+import base64
+import heapq
+import json
 import re
 from datetime import datetime
 from typing import Union
+from uuid import UUID
 
 from dateutil.relativedelta import relativedelta
+from django.contrib.postgres.fields import ArrayField
 from django.contrib.postgres.search import (
     SearchQuery,
     SearchRank,
@@ -10,11 +15,14 @@ from django.contrib.postgres.search import (
     TrigramSimilarity,
 )
 from django.db import models
-from django.db.models import Q
+from django.db.models import F, Func, Q, Value
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
 from django.utils.translation import gettext_lazy as _
 from fuzzywuzzy import fuzz
 from rest_framework import filters as drf_filters, status
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
 
 from applications.api.v1.serializers.application import (
@@ -24,6 +32,31 @@ from applications.api.v1.serializers.application import (
 from applications.enums import ApplicationStatus
 from applications.models import Application, ArchivalApplication
 from common.permissions import BFIsHandler
+from common.utils import hash_name_trigrams
+
+# Maximum number of name search candidates fetched from the database for scoring
+NAME_SEARCH_CANDIDATE_LIMIT = 1000
+# Maximum number of name search results serialized into the response
+NAME_SEARCH_RESULT_LIMIT = 100
+
+# Maximum page size of the cursor paginated search results
+SEARCH_MAX_PAGE_SIZE = 500
+# Number of rows fetched at a time from the database when streaming search results
+SEARCH_STREAM_CHUNK_SIZE = 200
+
+# Trigram hash, first name and last name fields used for the employee name search
+NAME_SEARCH_FIELDS = {
+    Application: (
+        "employee__name_trigrams",
+        "employee__encrypted_first_name",
+        "employee__encrypted_last_name",
+    ),
+    ArchivalApplication: (
+        "employee_name_trigrams",
+        "encrypted_employee_first_name",
+        "encrypted_employee_last_name",
+    ),
+}
 
 
 class SearchPattern(models.TextChoices):
@@ -61,6 +94,16 @@ class SearchView(APIView):
         search_from_archival = request.query_params.get("archival") == "1" or False
         application_number = request.query_params.get("app_no")
         load_all = request.query_params.get("load_all") == "1" or False
+        stream = request.query_params.get("stream") == "1" or False
+
+        try:
+            page_size = _parse_page_size(request.query_params.get("page_size"))
+            cursor = _decode_cursor(request.query_params.get("cursor"))
+        except ValueError:
+            return Response(
+                {"error": _("Invalid page size or cursor")},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         subsidy_in_effect = request.query_params.get("subsidy_in_effect")
 
@@ -103,7 +146,122 @@ class SearchView(APIView):
             application_number,
             search_from_archival,
             load_all,
+            SearchPagination(page_size=page_size, cursor=cursor, stream=stream),
+        )
+
+
+class SearchPagination:
+    """Cursor pagination and NDJSON streaming of search results ordered by
+    modification time. Applications and archival applications are merged into
+    one stable ordering by (modified_at, id), so the cursor of the last returned
+    row is enough to continue from both of the querysets."""
+
+    def __init__(self, page_size=None, cursor=None, stream=False):
+        self.page_size = page_size
+        self.cursor = cursor
+        self.stream = stream
+
+    @property
+    def enabled(self):
+        return self.stream or self.page_size is not None
+
+    def _ordered_querysets(self, application_queryset, archival_application_queryset):
+        querysets = [
+            (application_queryset, HandlerApplicationListSerializer),
+            (archival_application_queryset, ArchivalApplicationListSerializer),
+        ]
+        for queryset, serializer in querysets:
+            queryset = queryset.order_by("-modified_at", "-id")
+            if self.cursor:
+                modified_at, pk = self.cursor
+                queryset = queryset.filter(
+                    Q(modified_at__lt=modified_at)
+                    | Q(modified_at=modified_at, id__lt=pk)
+                )
+            yield queryset, serializer
+
+    @staticmethod
+    def _merge(rows):
+        return heapq.merge(
+            *rows, key=lambda row: (row[0].modified_at, row[0].id), reverse=True
+        )
+
+    def get_page(self, application_queryset, archival_application_queryset):
+        rows = [
+            [(instance, serializer) for instance in queryset[: self.page_size + 1]]
+            for queryset, serializer in self._ordered_querysets(
+                application_queryset, archival_application_queryset
+            )
+        ]
+        merged = list(self._merge(rows))
+        page = merged[: self.page_size]
+        next_cursor = (
+            _encode_cursor(page[-1][0]) if len(merged) > self.page_size else None
         )
+        data = [serializer(instance).data for instance, serializer in page]
+        return data, next_cursor
+
+    def stream_ndjson(self, application_queryset, archival_application_queryset):
+        rows = [
+            (
+                (instance, serializer)
+                for instance in queryset.iterator(chunk_size=SEARCH_STREAM_CHUNK_SIZE)
+            )
+            for queryset, serializer in self._ordered_querysets(
+                application_queryset, archival_application_queryset
+            )
+        ]
+        for instance, serializer in self._merge(rows):
+            yield json.dumps(serializer(instance).data, cls=JSONEncoder) + "\n"
+
+    def respond(
+        self,
+        application_queryset,
+        archival_application_queryset,
+        detected_pattern,
+        search_query_str,
+    ):
+        if self.stream:
+            return StreamingHttpResponse(
+                self.stream_ndjson(application_queryset, archival_application_queryset),
+                content_type="application/x-ndjson",
+            )
+
+        data, next_cursor = self.get_page(
+            application_queryset, archival_application_queryset
+        )
+        response = _create_search_response(
+            None, data, detected_pattern, search_query_str
+        )
+        response.data["next"] = next_cursor
+        return response
+
+
+def _parse_page_size(value):
+    if value is None:
+        return None
+    page_size = int(value)
+    if page_size < 1:
+        raise ValueError("Page size must be positive")
+    return min(page_size, SEARCH_MAX_PAGE_SIZE)
+
+
+def _encode_cursor(instance):
+    cursor = json.dumps([instance.modified_at.isoformat(), str(instance.id)])
+    return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+
+def _decode_cursor(value):
+    if not value:
+        return None
+    try:
+        modified_at, pk = json.loads(base64.urlsafe_b64decode(value.encode()))
+    except TypeError:
+        raise ValueError("Invalid cursor")
+    modified_at = parse_datetime(modified_at)
+    if modified_at is None:
+        raise ValueError("Invalid cursor")
+    return modified_at, UUID(pk)
 
 
 def _prepare_application_queryset(archived, subsidy_in_effect, years_since_decision):
@@ -167,7 +325,9 @@ def search_applications(
     application_number=None,
     search_from_archival=False,
     load_all=False,
+    pagination=None,
 ) -> Response:
+    pagination = pagination or SearchPagination()
     if application_number:
         querysets = _query_by_application_number(
             application_queryset, archival_application_queryset, application_number
@@ -177,7 +337,7 @@ def search_applications(
 
     if search_string == "" and in_memory_filter_string == "":
         return _query_and_respond_to_empty_search(
-            application_queryset, archival_application_queryset, load_all
+            application_queryset, archival_application_queryset, load_all, pagination
         )
 
     # Return early in case of number-like pattern
@@ -187,6 +347,7 @@ def search_applications(
             archival_application_queryset,
             search_string,
             detected_pattern,
+            pagination,
         )
     elif detected_pattern == SearchPattern.SSN:
         return _query_and_respond_to_ssn(
@@ -205,12 +366,10 @@ def search_applications(
         applications = results_for_related_company["applications"]
         archival_applications = results_for_related_company["archival"]
 
-    applications = HandlerApplicationListSerializer(applications, many=True).data
-
     filtered_data = []
     in_memory_results = None
 
-    # Use filter string to perform in-memory search
+    # Use filter string to perform employee name search
     if (
         detected_pattern in [SearchPattern.COMPANY, SearchPattern.IN_MEMORY]
         and in_memory_filter_string != ""
@@ -225,11 +384,8 @@ def search_applications(
         )
         filtered_data = in_memory_results["data"]
 
-        archival_data = ArchivalApplicationListSerializer(
-            archival_applications, many=True
-        ).data
         in_memory_results_archival = _perform_in_memory_search(
-            archival_data,
+            archival_applications,
             detected_pattern,
             archival_application_queryset,
             search_string,
@@ -240,7 +396,7 @@ def search_applications(
 
         detected_pattern = in_memory_results["detected_pattern"]
     else:
-        filtered_data = applications
+        filtered_data = HandlerApplicationListSerializer(applications, many=True).data
         if search_from_archival:
             filtered_data += ArchivalApplicationListSerializer(
                 archival_applications, many=True
@@ -256,50 +412,81 @@ def search_applications(
     )
 
 
-def _fuzzy_matching(applications, query, threshold):
+class SharedTrigramCount(Func):
+    """Count of the trigram hashes shared by an array field and the given hashes"""
+
+    template = "CARDINALITY(ARRAY(SELECT UNNEST(%(expressions)s)))"
+    arg_joiner = ") INTERSECT SELECT UNNEST("
+    output_field = models.IntegerField()
+
+    def __init__(self, field_name, trigram_hashes):
+        super().__init__(
+            F(field_name),
+            Value(trigram_hashes, output_field=ArrayField(models.CharField())),
+        )
+
+
+def _get_name_candidates(queryset, query):
+    """Fetch (pk, first_name, last_name) of the rows sharing at least one name trigram
+    with the query, the rows sharing the most trigrams first. The overlap filter is
+    backed by the GIN index of the trigram hashes, so only the candidates are decrypted.
+    """
+    trigram_field, first_name_field, last_name_field = NAME_SEARCH_FIELDS[
+        queryset.model
+    ]
+    trigram_hashes = hash_name_trigrams(query)
+    if not trigram_hashes:
+        return []
+
+    return list(
+        queryset.filter(**{f"{trigram_field}__overlap": trigram_hashes})
+        .annotate(shared_trigrams=SharedTrigramCount(trigram_field, trigram_hashes))
+        .order_by("-shared_trigrams", "-modified_at")
+        .values_list("pk", first_name_field, last_name_field)[
+            :NAME_SEARCH_CANDIDATE_LIMIT
+        ]
+    )
+
+
+def _fuzzy_matching(candidates, query, threshold):
     """Advanced fuzzy matching for all possible combinations of first/lastname orders"""
 
     scores = []
-    for index, app in enumerate(applications):
+    for pk, first_name, last_name in candidates:
         ratios = [
             fuzz.ratio(str(query), str(value))
-            for value in _get_filter_combinations(app)
+            for value in _get_filter_combinations(first_name, last_name)
         ]
-        scores.append({"index": index, "score": max(ratios)})
+        scores.append({"pk": pk, "score": max(ratios)})
 
     filtered_scores = [item for item in scores if item["score"] >= threshold]
-    sorted_filtered_scores = sorted(
-        filtered_scores, key=lambda k: k["score"], reverse=True
-    )
-
-    filtered_list_of_dicts = [
-        applications[item["index"]] for item in sorted_filtered_scores
-    ]
-    return {"data": filtered_list_of_dicts, "scores": sorted_filtered_scores}
+    return sorted(filtered_scores, key=lambda k: k["score"], reverse=True)
 
 
 def _contains_matching(
-    applications,
+    candidates,
     query,
 ):
     """Simple substring matching for all possible combinations of first/lastname orders,
     used as fallback for fuzzy matching"""
     results = []
-    for app in applications:
-        for value in _get_filter_combinations(app):
-            if query in value.lower():
-                results.append(app)
+    for pk, first_name, last_name in candidates:
+        for value in _get_filter_combinations(first_name, last_name):
+            if query in value:
+                results.append({"pk": pk, "score": None})
                 break
-    return {"data": results, "scores": None}
+    return results
 
 
-def _get_filter_combinations(app):
+def _get_filter_combinations(first_name, last_name):
     """Return all possible combinations of first/lastname orders for matching"""
+    first_name = (first_name or "").lower()
+    last_name = (last_name or "").lower()
     return [
-        (app["employee"]["first_name"] + " " + app["employee"]["last_name"]).lower(),
-        (app["employee"]["last_name"] + " " + app["employee"]["first_name"]).lower(),
-        app["employee"]["first_name"].lower(),
-        app["employee"]["last_name"].lower(),
+        f"{first_name} {last_name}",
+        f"{last_name} {first_name}",
+        first_name,
+        last_name,
     ]
 
 
@@ -335,8 +522,13 @@ def _query_by_application_number(
 
 
 def _query_and_respond_to_empty_search(
-    application_queryset, archival_application_queryset, load_all
+    application_queryset, archival_application_queryset, load_all, pagination
 ):
+    if pagination.enabled:
+        return pagination.respond(
+            application_queryset, archival_application_queryset, SearchPattern.ALL, ""
+        )
+
     data = []
     if load_all:
         data += HandlerApplicationListSerializer(application_queryset, many=True).data
@@ -397,6 +589,7 @@ def _query_and_respond_to_numbers(
     archival_application_queryset,
     search_query_str,
     detected_pattern,
+    pagination,
 ):
     """
     Perform simple LIKE query for application number, AHJO case ID and company business ID
@@ -406,11 +599,15 @@ def _query_and_respond_to_numbers(
         | Q(ahjo_case_id__icontains=search_query_str)
         | Q(application_number__icontains=search_query_str)
     )
-    data = HandlerApplicationListSerializer(applications, many=True).data
-
     archival_applications = archival_application_queryset.filter(
         company__business_id__icontains=search_query_str
     )
+    if pagination.enabled:
+        return pagination.respond(
+            applications, archival_applications, detected_pattern, search_query_str
+        )
+
+    data = HandlerApplicationListSerializer(applications, many=True).data
     data += ArchivalApplicationListSerializer(archival_applications, many=True).data
 
     return _create_search_response(
@@ -447,35 +644,48 @@ def _create_search_response(
 
 
 def _perform_in_memory_search(
-    data,
+    company_matches,
     detected_pattern,
     queryset,
     search_string,
     in_memory_filter_str,
     serializer,
 ):
-    """Perform more expensive in-memory search from within applications"""
+    """Search by employee name. The candidates are narrowed down in the database with
+    the name trigram index and only the best scoring matches are serialized."""
     if detected_pattern == SearchPattern.COMPANY:
         in_memory_filter_str = search_string
     # No previous search results, use all applications as haystack
-    if len(data) == 0 or search_string == "":
-        data = serializer(queryset, many=True).data
+    if search_string == "" or not company_matches.exists():
+        haystack = queryset
         detected_pattern = f"{SearchPattern.ALL} {SearchPattern.IN_MEMORY}"
     else:
+        haystack = company_matches
         detected_pattern = f"{SearchPattern.COMPANY} {SearchPattern.IN_MEMORY}"
 
+    candidates = _get_name_candidates(haystack, in_memory_filter_str)
+
     # Try fuzzy matching with high threshold. If zero matches, try lower score and finally try substring matching
-    in_memory_results = _fuzzy_matching(data, in_memory_filter_str, 80)
-    if not in_memory_results["data"]:
-        in_memory_results = _fuzzy_matching(data, in_memory_filter_str, 70)
-    if not in_memory_results["data"]:
-        in_memory_results = _contains_matching(
-            data,
-            in_memory_filter_str,
-        )
+    matches = _fuzzy_matching(candidates, in_memory_filter_str, 80)
+    if not matches:
+        matches = _fuzzy_matching(candidates, in_memory_filter_str, 70)
+    scores = None
+    if matches:
+        matches = matches[:NAME_SEARCH_RESULT_LIMIT]
+        scores = [
+            {"index": index, "score": match["score"]}
+            for index, match in enumerate(matches)
+        ]
+    else:
+        matches = _contains_matching(candidates, in_memory_filter_str)[
+            :NAME_SEARCH_RESULT_LIMIT
+        ]
         detected_pattern += "-fallback"
 
-    return {**in_memory_results, **{"detected_pattern": detected_pattern}}
+    instances = haystack.in_bulk([match["pk"] for match in matches])
+    data = serializer([instances[match["pk"]] for match in matches], many=True).data
+
+    return {"data": data, "scores": scores, "detected_pattern": detected_pattern}
 
 
 def _query_for_company_name(
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:38
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+from common.utils import hash_name_trigrams
+
+
+def populate_name_trigrams(apps, _):
+    employee = apps.get_model("applications", "Employee")
+    for instance in employee.objects.only(
+        "encrypted_first_name", "encrypted_last_name"
+    ).iterator(chunk_size=1000):
+        instance.name_trigrams = hash_name_trigrams(
+            instance.encrypted_first_name, instance.encrypted_last_name
+        )
+        instance.save(update_fields=["name_trigrams"])
+
+    archival_application = apps.get_model("applications", "ArchivalApplication")
+    for instance in archival_application.objects.only(
+        "encrypted_employee_first_name", "encrypted_employee_last_name"
+    ).iterator(chunk_size=1000):
+        instance.employee_name_trigrams = hash_name_trigrams(
+            instance.encrypted_employee_first_name,
+            instance.encrypted_employee_last_name,
+        )
+        instance.save(update_fields=["employee_name_trigrams"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0090_alter_application_talpa_status_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivalapplication',
+            name='employee_name_trigrams',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=16), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='name_trigrams',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=16), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='historicalemployee',
+            name='name_trigrams',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=16), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='archivalapplication',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['employee_name_trigrams'], name='bf_applicat_employe_5ec093_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name_trigrams'], name='bf_applicat_name_tr_9bbf22_gin'),
+        ),
+        migrations.RunPython(populate_name_trigrams, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,8 @@ from typing import List
 
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
 from django.db import connection, models
 from django.db.models import Exists, F, JSONField, OuterRef, Prefetch, Subquery
@@ -38,7 +40,7 @@ from applications.exceptions import (
 )
 from calculator.enums import InstalmentStatus
 from common.localized_iban_field import LocalizedIBANField
-from common.utils import DurationMixin
+from common.utils import DurationMixin, hash_name_trigrams, NAME_TRIGRAM_HASH_LENGTH
 from companies.models import Company
 from shared.common.utils import social_security_number_birthdate
 from shared.models.abstract_models import TimeStampedModel, UUIDModel
@@ -1050,6 +1052,14 @@ class Employee(UUIDModel, TimeStampedModel):
         encrypted_field_name="encrypted_social_security_number",
     )
 
+    # Keyed hashes of the name trigrams, used for fuzzy name search
+    name_trigrams = ArrayField(
+        models.CharField(max_length=NAME_TRIGRAM_HASH_LENGTH),
+        default=list,
+        blank=True,
+        editable=False,
+    )
+
     phone_number = PhoneNumberField(
         verbose_name=_("phone number"),
         blank=True,
@@ -1124,6 +1134,14 @@ class Employee(UUIDModel, TimeStampedModel):
         # input validation should ensure it's always valid.
         return social_security_number_birthdate(self.social_security_number)
 
+    def save(self, *args, **kwargs):
+        self.name_trigrams = hash_name_trigrams(
+            self.encrypted_first_name, self.encrypted_last_name
+        )
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "name_trigrams"}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return "{} {} ({})".format(self.first_name, self.last_name, self.email)
 
@@ -1131,6 +1149,7 @@ class Employee(UUIDModel, TimeStampedModel):
         db_table = "bf_applications_employee"
         verbose_name = _("employee")
         verbose_name_plural = _("employees")
+        indexes = [GinIndex(fields=["name_trigrams"])]
 
 
 def cleanup_filename(instance, filename):
@@ -1592,6 +1611,7 @@ class AhjoDecisionProposalDraft(TimeStampedModel):
 class ArchivalApplication(UUIDModel, TimeStampedModel):
     class Meta:
         db_table = "bf_applications_archival_application"
+        indexes = [GinIndex(fields=["employee_name_trigrams"])]
 
     application_number = models.TextField(
         verbose_name="application_number",
@@ -1630,6 +1650,14 @@ class ArchivalApplication(UUIDModel, TimeStampedModel):
         encrypted_field_name="encrypted_employee_last_name",
     )
 
+    # Keyed hashes of the employee name trigrams, used for fuzzy name search
+    employee_name_trigrams = ArrayField(
+        models.CharField(max_length=NAME_TRIGRAM_HASH_LENGTH),
+        default=list,
+        blank=True,
+        editable=False,
+    )
+
     start_date = models.DateField(
         verbose_name="start_date",
         blank=True,
@@ -1668,6 +1696,17 @@ class ArchivalApplication(UUIDModel, TimeStampedModel):
         null=True,
     )
 
+    def save(self, *args, **kwargs):
+        self.employee_name_trigrams = hash_name_trigrams(
+            self.encrypted_employee_first_name, self.encrypted_employee_last_name
+        )
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {
+                *kwargs["update_fields"],
+                "employee_name_trigrams",
+            }
+        super().save(*args, **kwargs)
+
     def employee(self):
         return {
             "first_name": self.employee_first_name,
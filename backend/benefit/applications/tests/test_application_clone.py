@@ -184,6 +184,7 @@ employee_fields = {
         "encrypted_social_security_number",
         "encrypted_first_name",
         "encrypted_last_name",
+        "name_trigrams",
         "phone_number",
         "email",
         "employee_language",
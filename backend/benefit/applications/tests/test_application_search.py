@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from urllib.parse import urlencode
 
@@ -6,10 +7,11 @@ from dateutil.relativedelta import relativedelta
 from django.core.management import call_command
 from rest_framework.reverse import reverse
 
+from applications.api.v1 import search_views
 from applications.api.v1.search_views import SearchPattern, SubsidyInEffect
 from applications.enums import ApplicationBatchStatus, ApplicationStatus
 from applications.models import ArchivalApplication
-from applications.tests.factories import ApplicationBatchFactory
+from applications.tests.factories import ApplicationBatchFactory, ApplicationFactory
 from applications.tests.test_command_import_archival_applications import (
     ImportArchivalApplicationsTestUtility,
 )
@@ -371,3 +373,94 @@ def test_search_related_applications(handler_api_client, app_no, application):
     response = handler_api_client.get(f"{api_url}?{params}")
     data = response.json()
     assert len(data["matches"]) == 1
+
+
+def test_search_employee_name_ranking(handler_api_client, monkeypatch):
+    names = [
+        ("Ville", "Virtanen"),
+        ("Ville", "Virtala"),
+        ("Matti", "Virtanen"),
+        ("Kalle", "Korhonen"),
+    ]
+    for first_name, last_name in names:
+        application = ApplicationFactory(archived=False)
+        application.employee.first_name = first_name
+        application.employee.last_name = last_name
+        application.employee.save()
+
+    params = urlencode({"q": "nimi:ville virtanen"})
+    response = handler_api_client.get(f"{api_url}?{params}")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["detected_pattern"] == f"{SearchPattern.ALL} {SearchPattern.IN_MEMORY}"
+    assert [
+        (match["employee"]["first_name"], match["employee"]["last_name"])
+        for match in data["matches"]
+    ] == [("Ville", "Virtanen"), ("Ville", "Virtala")]
+    assert [score["index"] for score in data["score"]] == [0, 1]
+    assert data["score"][0]["score"] == 100
+    assert data["score"] == sorted(
+        data["score"], key=lambda k: k["score"], reverse=True
+    )
+
+    # Only the best matches are serialized
+    monkeypatch.setattr(search_views, "NAME_SEARCH_RESULT_LIMIT", 1)
+    response = handler_api_client.get(f"{api_url}?{params}")
+    data = response.json()
+    assert len(data["matches"]) == 1
+    assert data["matches"][0]["employee"]["last_name"] == "Virtanen"
+
+
+def _create_applications_and_archival_applications(count):
+    ImportArchivalApplicationsTestUtility.create_companies_for_archival_applications()
+    call_command("import_archival_applications", filename="test.xlsx", production=True)
+    for _ in range(count):
+        ApplicationFactory(archived=False)
+    return count + ArchivalApplication.objects.count()
+
+
+def test_search_cursor_pagination(handler_api_client):
+    total_count = _create_applications_and_archival_applications(3)
+
+    matches = []
+    params = {"q": "", "load_all": 1, "page_size": 2}
+    while True:
+        response = handler_api_client.get(f"{api_url}?{urlencode(params)}")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == len(data["matches"]) <= 2
+        matches += data["matches"]
+        if not data["next"]:
+            break
+        params["cursor"] = data["next"]
+
+    assert len(matches) == total_count
+    assert len({match["id"] for match in matches}) == total_count
+    assert {match["status"] for match in matches} >= {ApplicationStatus.ARCHIVAL}
+
+
+def test_search_stream_ndjson(handler_api_client):
+    total_count = _create_applications_and_archival_applications(2)
+
+    params = urlencode({"q": "", "load_all": 1, "stream": 1})
+    response = handler_api_client.get(f"{api_url}?{params}")
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert len(lines) == total_count
+    assert len({json.loads(line)["id"] for line in lines}) == total_count
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"page_size": 0},
+        {"page_size": "x"},
+        {"page_size": 10, "cursor": "invalid"},
+    ],
+)
+def test_search_invalid_pagination(handler_api_client, params):
+    params = urlencode({"q": "", **params})
+    response = handler_api_client.get(f"{api_url}?{params}")
+    assert response.status_code == 400
@@ -9,6 +9,7 @@ from applications.tests.factories import BaseApplicationBatchFactory
 from applications.tests.test_application_batch_api import (
     fill_as_valid_batch_completion_and_save,
 )
+from common.utils import hash_name_trigrams
 from helsinkibenefit.tests.conftest import *  # noqa
 
 
@@ -184,3 +185,18 @@ def test_encrypted_searchable_social_security_number(employee):
     assert employee.social_security_number == ""
     assert Employee.objects.filter(social_security_number=initial_ssn).count() == 0
     assert Employee.objects.filter(social_security_number="").count() == 1
+
+
+def test_employee_name_trigrams(employee):
+    employee.first_name = "Mikro"
+    employee.last_name = "Matriisi-Artikkeli"
+    employee.save()
+    employee.refresh_from_db()
+    assert employee.name_trigrams == hash_name_trigrams("Mikro", "Matriisi-Artikkeli")
+    assert set(hash_name_trigrams("mikro")).issubset(employee.name_trigrams)
+    assert not set(hash_name_trigrams("Virtanen")).issubset(employee.name_trigrams)
+
+    employee.last_name = "Virtanen"
+    employee.save(update_fields=["encrypted_last_name", "last_name"])
+    employee.refresh_from_db()
+    assert employee.name_trigrams == hash_name_trigrams("Mikro", "Virtanen")
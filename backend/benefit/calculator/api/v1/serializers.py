@@ -389,6 +389,41 @@ class TrainingCompensationSerializer(serializers.ModelSerializer):
         list_serializer_class = UpdateOrderedListSerializer
 
 
+class CalculationPreviewSerializer(serializers.Serializer):
+    """
+    Calculation source data as edited by the handler but not yet saved. Fields that are
+    not given keep the values currently saved for the application.
+    """
+
+    benefit_type = serializers.ChoiceField(choices=BenefitType.choices, required=False)
+    calculation = CalculationSerializer(required=False)
+    pay_subsidies = PaySubsidySerializer(many=True, required=False)
+    training_compensations = TrainingCompensationSerializer(many=True, required=False)
+
+
+class InstalmentPreviewSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Instalment
+        fields = [
+            "instalment_number",
+            "amount",
+            "due_date",
+            "status",
+        ]
+        read_only_fields = fields
+
+
+class CalculationPreviewResultSerializer(serializers.Serializer):
+    calculated_benefit_amount = serializers.DecimalField(
+        max_digits=Calculation.calculated_benefit_amount.field.max_digits,
+        decimal_places=Calculation.calculated_benefit_amount.field.decimal_places,
+        allow_null=True,
+        read_only=True,
+    )
+    rows = CalculationRowSerializer(many=True, read_only=True)
+    instalments = InstalmentPreviewSerializer(many=True, read_only=True)
+
+
 class PreviousBenefitSerializer(serializers.ModelSerializer):
     class Meta:
         model = PreviousBenefit
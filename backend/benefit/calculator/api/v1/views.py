@@ -1,4 +1,5 @@
 from django.shortcuts import get_object_or_404
+from django.utils.translation import gettext_lazy as _
 from django_filters import rest_framework as filters
 from drf_spectacular.utils import extend_schema
 from rest_framework import filters as drf_filters, status
@@ -6,12 +7,21 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from applications.enums import ApplicationBatchStatus, ApplicationTalpaStatus
+from applications.models import Application
 from calculator.api.v1.serializers import (
+    CalculationPreviewResultSerializer,
+    CalculationPreviewSerializer,
     InstalmentSerializer,
     PreviousBenefitSerializer,
 )
 from calculator.enums import InstalmentStatus
-from calculator.models import Instalment, PreviousBenefit
+from calculator.models import (
+    Instalment,
+    PaySubsidy,
+    PreviousBenefit,
+    TrainingCompensation,
+)
+from calculator.rules import HelsinkiBenefitCalculator
 from common.permissions import BFIsHandler
 from shared.audit_log.viewsets import AuditLoggingModelViewSet
 
@@ -96,3 +106,65 @@ class InstalmentView(APIView):
                     return Response(serializer.data, status=status.HTTP_200_OK)
                 return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class CalculationPreviewView(APIView):
+    permission_classes = [BFIsHandler]
+
+    @extend_schema(
+        description=(
+            "Run the calculation of the application with unsaved calculation, pay subsidy and"
+            " training compensation values. Nothing is saved, the resulting rows and"
+            " instalments are only returned in the response."
+        ),
+        request=CalculationPreviewSerializer,
+        responses=CalculationPreviewResultSerializer,
+    )
+    def post(self, request, application_id):
+        application = get_object_or_404(
+            Application.objects.select_related("calculation"), pk=application_id
+        )
+        if not hasattr(application, "calculation"):
+            return Response(
+                {"detail": _("Application has no calculation")},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = CalculationPreviewSerializer(application, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        # The objects are modified in memory only, none of them is saved
+        calculation = application.calculation
+        for field_name, value in data.get("calculation", {}).items():
+            if field_name not in ["id", "handler"]:
+                setattr(calculation, field_name, value)
+        if "benefit_type" in data:
+            application.benefit_type = data["benefit_type"]
+
+        pay_subsidies = None
+        if "pay_subsidies" in data:
+            pay_subsidies = [
+                PaySubsidy(application=application, **item)
+                for item in data["pay_subsidies"]
+            ]
+        training_compensations = None
+        if "training_compensations" in data:
+            training_compensations = [
+                TrainingCompensation(application=application, **item)
+                for item in data["training_compensations"]
+            ]
+
+        calculation.calculator = HelsinkiBenefitCalculator.get_calculator(
+            calculation,
+            pay_subsidies=pay_subsidies,
+            training_compensations=training_compensations,
+        )
+        rows, instalments = calculation.calculator.preview()
+        result = CalculationPreviewResultSerializer(
+            {
+                "calculated_benefit_amount": calculation.calculated_benefit_amount,
+                "rows": rows,
+                "instalments": instalments,
+            }
+        )
+        return Response(result.data, status=status.HTTP_200_OK)
@@ -0,0 +1,184 @@
+import multiprocessing
+import time
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from calculator.models import Calculation
+from calculator.rules import HelsinkiBenefitCalculator
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculate the calculations of open applications, e.g. after the calculation rules"
+        " or settings have changed. The calculations are processed in chunks, each chunk"
+        " in its own transaction, optionally in parallel worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--status",
+            type=str,
+            nargs="+",
+            default=HelsinkiBenefitCalculator.CALCULATION_ALLOWED_STATUSES,
+            help="The statuses of the applications to recalculate. \
+pass multiple statuses separated by spaces.",
+        )
+        parser.add_argument(
+            "--start-date",
+            type=date.fromisoformat,
+            help="Only recalculate calculations whose benefit period ends on or after this date (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--end-date",
+            type=date.fromisoformat,
+            help="Only recalculate calculations whose benefit period starts on or before this date (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=100,
+            help="The number of calculations processed in one transaction",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="The number of worker processes",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the changes in the calculated benefit amounts, do not save anything",
+        )
+
+    def handle(self, *args, **options):
+        statuses = options["status"]
+        invalid_statuses = [
+            status
+            for status in statuses
+            if status not in HelsinkiBenefitCalculator.CALCULATION_ALLOWED_STATUSES
+        ]
+        if invalid_statuses:
+            raise CommandError(
+                f"Invalid statuses provided: {', '.join(invalid_statuses)}. Allowed statuses are: \
+{', '.join(HelsinkiBenefitCalculator.CALCULATION_ALLOWED_STATUSES)}."
+            )
+        if options["chunk_size"] < 1 or options["workers"] < 1:
+            raise CommandError("Chunk size and the number of workers must be positive")
+
+        calculation_ids = list(
+            _get_calculations(
+                statuses, options["start_date"], options["end_date"]
+            ).values_list("pk", flat=True)
+        )
+        chunks = [
+            calculation_ids[i : i + options["chunk_size"]]
+            for i in range(0, len(calculation_ids), options["chunk_size"])
+        ]
+        dry_run = options["dry_run"]
+
+        started = time.monotonic()
+        results = []
+        failed = 0
+        for chunk, result in _process_chunks(chunks, dry_run, options["workers"]):
+            if isinstance(result, Exception):
+                failed += len(chunk)
+                self.stderr.write(
+                    f"Failed to recalculate a chunk of {len(chunk)} calculations: {result}"
+                )
+            else:
+                results.extend(result)
+        elapsed = time.monotonic() - started
+
+        changed = [
+            (application_number, old_amount, new_amount)
+            for application_number, old_amount, new_amount in results
+            if old_amount != new_amount
+        ]
+        for application_number, old_amount, new_amount in sorted(
+            changed, key=lambda change: change[0] or 0
+        ):
+            self.stdout.write(
+                f"Application {application_number}: {old_amount} -> {new_amount}"
+            )
+
+        throughput = len(results) / elapsed if elapsed else 0
+        self.stdout.write(
+            f"{'Dry run: ' if dry_run else ''}Recalculated {len(results)} calculations"
+            f" in {elapsed:.1f} s ({throughput:.1f} calculations/s),"
+            f" {len(changed)} calculated benefit amounts changed, {failed} failed"
+        )
+
+
+def _get_calculations(statuses, start_date=None, end_date=None):
+    calculations = Calculation.objects.filter(application__status__in=statuses)
+    if start_date:
+        calculations = calculations.filter(end_date__gte=start_date)
+    if end_date:
+        calculations = calculations.filter(start_date__lte=end_date)
+    return calculations.order_by("pk")
+
+
+def _process_chunks(chunks, dry_run, workers):
+    """Yield (chunk, result) pairs, where result is the list returned by _recalculate_chunk
+    or the exception raised while processing the chunk"""
+    if workers == 1:
+        for chunk in chunks:
+            try:
+                yield chunk, _recalculate_chunk(chunk, dry_run)
+            except Exception as e:
+                yield chunk, e
+        return
+
+    # The forked workers must not share the database connections of the parent process
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        futures = {
+            executor.submit(_recalculate_chunk, chunk, dry_run): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+
+
+def _recalculate_chunk(calculation_ids, dry_run) -> list[tuple[int, object, object]]:
+    """Recalculate the given calculations in a single transaction.
+    Returns a list of (application_number, old amount, new amount)"""
+    calculations = (
+        Calculation.objects.filter(pk__in=calculation_ids)
+        .select_related("application")
+        .prefetch_related(
+            "application__pay_subsidies", "application__training_compensations"
+        )
+    )
+    results = []
+    with transaction.atomic():
+        for calculation in calculations:
+            old_amount = calculation.calculated_benefit_amount
+            application = calculation.application
+            calculation.calculator = HelsinkiBenefitCalculator.get_calculator(
+                calculation,
+                pay_subsidies=list(application.pay_subsidies.all()),
+                training_compensations=list(application.training_compensations.all()),
+            )
+            if dry_run:
+                calculation.calculator.preview()
+                calculation.calculator = None
+            else:
+                calculation.calculate()
+            results.append(
+                (
+                    application.application_number,
+                    old_amount,
+                    calculation.calculated_benefit_amount,
+                )
+            )
+    return results
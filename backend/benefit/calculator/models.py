@@ -767,8 +767,8 @@ class SalaryBenefitSumSubTotalsRow(CalculationRow):
         return sum(
             [
                 row.amount
-                for row in self.calculation.rows.all().filter(
-                    row_type=RowType.HELSINKI_BENEFIT_SUB_TOTAL_EUR
+                for row in self.calculation.calculator.get_rows(
+                    RowType.HELSINKI_BENEFIT_SUB_TOTAL_EUR
                 )
             ]
         )
@@ -1,12 +1,14 @@
 import collections
 import datetime
 import decimal
+import functools
 import logging
 from typing import Union
 
 from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
+from simple_history.utils import bulk_create_with_history
 
 from applications.enums import ApplicationStatus, BenefitType, PaySubsidyGranted
 from calculator.enums import DescriptionType, InstalmentStatus, RowType
@@ -28,6 +30,7 @@ from calculator.models import (
     SalaryCostsRow,
     StateAidMaxMonthlyRow,
     TotalDeductionsMonthlyRow,
+    TrainingCompensation,
     TrainingCompensationMonthlyRow,
 )
 from common.utils import pairwise
@@ -39,10 +42,48 @@ BenefitSubRange = collections.namedtuple(
 )
 
 
+def _bulk_delete_with_history(queryset) -> None:
+    """Delete the objects with a single query and bulk create their deletion history records,
+    instead of the per-object signals of QuerySet.delete()"""
+    instances = list(queryset)
+    if not instances:
+        return
+    history_model = queryset.model.history.model
+    history_date = timezone.now()
+    history_model.objects.bulk_create(
+        [
+            history_model(
+                history_date=history_date,
+                history_user=history_model.get_default_history_user(instance),
+                history_type="-",
+                **{
+                    field.attname: getattr(instance, field.attname)
+                    for field in history_model.tracked_fields
+                },
+            )
+            for instance in instances
+        ]
+    )
+    queryset.model.objects.filter(
+        pk__in=[instance.pk for instance in instances]
+    )._raw_delete(queryset.db)
+
+
 class HelsinkiBenefitCalculator:
-    def __init__(self, calculation: Calculation):
+    def __init__(
+        self,
+        calculation: Calculation,
+        pay_subsidies: Union[list[PaySubsidy], None] = None,
+        training_compensations: Union[list[TrainingCompensation], None] = None,
+    ):
+        """The pay subsidies and training compensations default to those saved for the application,
+        unsaved objects can be given instead to preview the calculation"""
         self.calculation = calculation
+        self._pay_subsidies = pay_subsidies
+        self._training_compensations = training_compensations
         self._row_counter = 0
+        self._rows = []
+        self._instalments = []
         self.instalment_threshold = settings.INSTALMENT_THRESHOLD
         self.first_instalment_limit = settings.FIRST_INSTALMENT_LIMIT
 
@@ -73,16 +114,39 @@ class HelsinkiBenefitCalculator:
         return None
 
     @staticmethod
-    def get_calculator(calculation: Calculation):
+    def get_calculator(calculation: Calculation, **kwargs):
         # in future, one might use e.g. application date to determine the correct calculator
         if calculation.override_monthly_benefit_amount is not None:
-            return ManualOverrideCalculator(calculation)
+            return ManualOverrideCalculator(calculation, **kwargs)
         elif calculation.application.benefit_type == BenefitType.SALARY_BENEFIT:
-            return SalaryBenefitCalculator2023(calculation)
+            return SalaryBenefitCalculator2023(calculation, **kwargs)
         elif calculation.application.benefit_type == BenefitType.EMPLOYMENT_BENEFIT:
-            return EmployeeBenefitCalculator2021(calculation)
+            return EmployeeBenefitCalculator2021(calculation, **kwargs)
         else:
-            return DummyBenefitCalculator(calculation)
+            return DummyBenefitCalculator(calculation, **kwargs)
+
+    @staticmethod
+    def _order_by_start_date(items: list) -> list:
+        # same order as order_by("start_date"), nulls last
+        return sorted(
+            items,
+            key=lambda item: (
+                item.start_date is None,
+                item.start_date or datetime.date.min,
+            ),
+        )
+
+    def get_pay_subsidies(self) -> list[PaySubsidy]:
+        if self._pay_subsidies is not None:
+            return self._order_by_start_date(self._pay_subsidies)
+        return list(self.calculation.application.pay_subsidies.order_by("start_date"))
+
+    def get_training_compensations(self) -> list[TrainingCompensation]:
+        if self._training_compensations is not None:
+            return self._order_by_start_date(self._training_compensations)
+        return list(
+            self.calculation.application.training_compensations.order_by("start_date")
+        )
 
     def get_sub_total_ranges(self):
         """return a list of BenefitSubRange(start_date, end_date, pay_subsidy, training_compensation)
@@ -93,12 +157,8 @@ class HelsinkiBenefitCalculator:
             raise ValueError(
                 "Cannot get sub total range of calculation start_date or end_date"
             )
-        pay_subsidies = PaySubsidy.merge_compatible_subsidies(
-            list(self.calculation.application.pay_subsidies.order_by("start_date"))
-        )
-        training_compensations = list(
-            self.calculation.application.training_compensations.order_by("start_date")
-        )
+        pay_subsidies = PaySubsidy.merge_compatible_subsidies(self.get_pay_subsidies())
+        training_compensations = self.get_training_compensations()
         change_days = self._get_change_days(
             pay_subsidies,
             training_compensations,
@@ -130,17 +190,17 @@ class HelsinkiBenefitCalculator:
 
         return ranges
 
+    def get_rows(self, row_type: RowType) -> list[CalculationRow]:
+        # The rows are kept in memory until the calculation is complete
+        return [row for row in self._rows if row.row_type == row_type]
+
     def get_amount(self, row_type: RowType, default=None):
         # This function is used by the various CalculationRow to retrieve a previously calculated value
-        row = (
-            self.calculation.rows.order_by("-ordering")
-            .filter(row_type=row_type)
-            .first()
-        )
-        if not row and default is not None:
+        rows = self.get_rows(row_type)
+        if not rows and default is not None:
             return default
-        assert row, f"Internal error, {row_type} not found"
-        return row.amount
+        assert rows, f"Internal error, {row_type} not found"
+        return rows[-1].amount
 
     # if calculation is enabled for non-handler users, need to change this
     # locked applications (transferred to Ahjo) should never be re-calculated.
@@ -212,15 +272,31 @@ class HelsinkiBenefitCalculator:
             tuple[int, decimal.Decimal, datetime.datetime, InstalmentStatus]
         ],
     ) -> None:
-        """Create instalment objects from the provided instalment data."""
-        for instalment_number, amount, due_date, status in instalments:
-            Instalment.objects.create(
+        """Create instalment objects from the provided instalment data.
+        The instalments are kept in memory until the calculation is complete."""
+        self._instalments.extend(
+            Instalment(
                 calculation=self.calculation,
                 instalment_number=instalment_number,
                 amount=amount,
-                due_date=due_date,
+                due_date=timezone.localdate(due_date),
                 status=status,
             )
+            for instalment_number, amount, due_date, status in instalments
+        )
+
+    def _calculate_in_memory(self) -> None:
+        self._row_counter = 0
+        self._rows = []
+        self._instalments = []
+        if self.can_calculate():
+            self.create_rows()
+            # the total benefit amount is stored in Calculation model, for easier processing.
+            total_benefit_amount = self.get_amount(RowType.HELSINKI_BENEFIT_TOTAL_EUR)
+            self.calculation.calculated_benefit_amount = total_benefit_amount
+            self.create_instalments(total_benefit_amount)
+        else:
+            self.calculation.calculated_benefit_amount = None
 
     @transaction.atomic
     def calculate(self, override_status=False):
@@ -228,27 +304,27 @@ class HelsinkiBenefitCalculator:
             self.calculation.application.status in self.CALCULATION_ALLOWED_STATUSES
             or override_status
         ):
-            self.calculation.rows.all().delete()
+            _bulk_delete_with_history(self.calculation.rows.all())
             self.calculation.instalments.all().delete()
-            if self.can_calculate():
-                self.create_rows()
-                # the total benefit amount is stored in Calculation model, for easier processing.
-                total_benefit_amount = self.get_amount(
-                    RowType.HELSINKI_BENEFIT_TOTAL_EUR
-                )
-                self.calculation.calculated_benefit_amount = total_benefit_amount
-                self.create_instalments(total_benefit_amount)
-            else:
-                self.calculation.calculated_benefit_amount = None
+            self._calculate_in_memory()
+            bulk_create_with_history(self._rows, CalculationRow)
+            Instalment.objects.bulk_create(self._instalments)
             self.calculation.save()
 
+    def preview(self) -> tuple[list[CalculationRow], list[Instalment]]:
+        """Run the calculation without writing anything to the database.
+        Returns the unsaved rows and instalments, and sets calculated_benefit_amount
+        of the (unsaved) calculation."""
+        self._calculate_in_memory()
+        return self._rows, self._instalments
+
     def _create_row(self, row_class: CalculationRow, **kwargs):
         row = row_class(
             calculation=self.calculation, ordering=self._row_counter, **kwargs
         )
         self._row_counter += 1
         row.update_row()
-        row.save()
+        self._rows.append(row)
         return row
 
     def create_rows(self):
@@ -290,13 +366,12 @@ class SalaryBenefitCalculator2023(HelsinkiBenefitCalculator):
     SALARY_BENEFIT_MAX = settings.SALARY_BENEFIT_MAX
     SALARY_BENEFIT_NEW_MAX = settings.SALARY_BENEFIT_NEW_MAX
 
-    @property
+    @functools.cached_property
     def is_subsidised(self) -> bool:
-        return (
-            self.calculation.application.pay_subsidy_granted
-            in [PaySubsidyGranted.GRANTED, PaySubsidyGranted.GRANTED_AGED]
-            or self.calculation.application.pay_subsidies.exists()
-        )
+        return self.calculation.application.pay_subsidy_granted in [
+            PaySubsidyGranted.GRANTED,
+            PaySubsidyGranted.GRANTED_AGED,
+        ] or bool(self.get_pay_subsidies())
 
     @property
     def max_monthly_benefit(self) -> int:
@@ -321,7 +396,7 @@ class SalaryBenefitCalculator2023(HelsinkiBenefitCalculator):
             ]
         ):
             return False
-        for pay_subsidy in self.calculation.application.pay_subsidies.all():
+        for pay_subsidy in self.get_pay_subsidies():
             if not all([pay_subsidy.start_date, pay_subsidy.end_date]):
                 return False
         return True
@@ -5,6 +5,7 @@ from unittest import mock
 
 import factory
 import pytest
+from django.urls import reverse
 from django.utils import timezone
 
 from applications.api.v1.serializers.application import (
@@ -26,6 +27,7 @@ from applications.tests.test_applications_api import (
 )
 from calculator.api.v1.serializers import CalculationSerializer
 from calculator.enums import InstalmentStatus
+from calculator.models import CalculationRow
 from calculator.tests.factories import CalculationFactory, PaySubsidyFactory
 from common.tests.conftest import get_client_user
 from common.utils import duration_in_months, to_decimal
@@ -760,3 +762,88 @@ def test_application_calculation_instalments(
         due_date = instalment_2.due_date
         future_date = timezone.now() + timedelta(days=181)
         assert due_date == future_date.date()
+
+
+def get_calculation_preview_url(application):
+    return reverse(
+        "handler-calculation-preview", kwargs={"application_id": application.pk}
+    )
+
+
+def test_calculation_preview(handler_api_client, handling_application):
+    calculation = handling_application.calculation
+    data = HandlerApplicationSerializer(handling_application).data
+    data["calculation"]["monthly_pay"] = "2345.67"
+    preview_data = {
+        "calculation": data["calculation"],
+        "pay_subsidies": [
+            {
+                "start_date": str(calculation.start_date),
+                "end_date": str(calculation.end_date),
+                "pay_subsidy_percent": 50,
+                "work_time_percent": "100.00",
+            }
+        ],
+        "training_compensations": [],
+    }
+    row_history_count = CalculationRow.history.count()
+    row_ids = set(calculation.rows.values_list("id", flat=True))
+    instalment_ids = set(calculation.instalments.values_list("id", flat=True))
+    pay_subsidy_ids = set(
+        handling_application.pay_subsidies.values_list("id", flat=True)
+    )
+    calculated_benefit_amount = calculation.calculated_benefit_amount
+
+    response = handler_api_client.post(
+        get_calculation_preview_url(handling_application), preview_data
+    )
+
+    assert response.status_code == 200
+    assert response.data["rows"]
+    assert response.data["instalments"]
+    assert response.data["calculated_benefit_amount"] is not None
+    assert sum(
+        decimal.Decimal(instalment["amount"])
+        for instalment in response.data["instalments"]
+    ) == decimal.Decimal(response.data["calculated_benefit_amount"])
+
+    # nothing has been saved
+    calculation.refresh_from_db()
+    assert calculation.monthly_pay != decimal.Decimal("2345.67")
+    assert calculation.calculated_benefit_amount == calculated_benefit_amount
+    assert set(calculation.rows.values_list("id", flat=True)) == row_ids
+    assert set(calculation.instalments.values_list("id", flat=True)) == instalment_ids
+    assert (
+        set(handling_application.pay_subsidies.values_list("id", flat=True))
+        == pay_subsidy_ids
+    )
+    assert CalculationRow.history.count() == row_history_count
+
+    # the preview matches the result of saving the same values
+    calculation.monthly_pay = decimal.Decimal("2345.67")
+    calculation.save()
+    handling_application.pay_subsidies.all().delete()
+    handling_application.training_compensations.all().delete()
+    PaySubsidyFactory(
+        application=handling_application,
+        start_date=calculation.start_date,
+        end_date=calculation.end_date,
+        pay_subsidy_percent=50,
+        work_time_percent=100,
+    )
+    calculation.init_calculator()
+    calculation.calculate()
+    assert calculation.calculated_benefit_amount == decimal.Decimal(
+        response.data["calculated_benefit_amount"]
+    )
+    assert [
+        (row.row_type, row.amount) for row in calculation.rows.order_by("ordering")
+    ] == [
+        (row["row_type"], decimal.Decimal(row["amount"]))
+        for row in response.data["rows"]
+    ]
+
+
+def test_calculation_preview_as_applicant(api_client, handling_application):
+    response = api_client.post(get_calculation_preview_url(handling_application), {})
+    assert response.status_code == 403
@@ -0,0 +1,110 @@
+import decimal
+from datetime import timedelta
+from io import StringIO
+
+import factory
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from applications.tests.conftest import *  # noqa
+from applications.tests.factories import HandlingApplicationFactory
+from calculator.models import Calculation
+
+
+def _set_stale_amount(application):
+    calculation = application.calculation
+    correct_amount = calculation.calculated_benefit_amount
+    assert correct_amount is not None
+    Calculation.objects.filter(pk=calculation.pk).update(
+        calculated_benefit_amount=correct_amount + 100
+    )
+    return correct_amount
+
+
+def test_recalculate_calculations_dry_run(handling_application, decided_application):
+    correct_amount = _set_stale_amount(handling_application)
+    decided_amount = decided_application.calculation.calculated_benefit_amount
+    instalment_ids = set(
+        handling_application.calculation.instalments.values_list("id", flat=True)
+    )
+
+    out = StringIO()
+    call_command("recalculate_calculations", "--dry-run", stdout=out)
+
+    assert (
+        f"Application {handling_application.application_number}:"
+        f" {correct_amount + 100:.2f} -> " in out.getvalue()
+    )
+    assert "Dry run: Recalculated 1 calculations" in out.getvalue()
+    assert "1 calculated benefit amounts changed, 0 failed" in out.getvalue()
+
+    handling_application.calculation.refresh_from_db()
+    assert (
+        handling_application.calculation.calculated_benefit_amount
+        == correct_amount + 100
+    )
+    assert (
+        set(handling_application.calculation.instalments.values_list("id", flat=True))
+        == instalment_ids
+    )
+    decided_application.calculation.refresh_from_db()
+    assert decided_application.calculation.calculated_benefit_amount == decided_amount
+
+
+def test_recalculate_calculations(handling_application):
+    correct_amount = _set_stale_amount(handling_application)
+
+    out = StringIO()
+    call_command("recalculate_calculations", "--chunk-size", "1", stdout=out)
+
+    assert "Recalculated 1 calculations" in out.getvalue()
+    handling_application.calculation.refresh_from_db()
+    assert handling_application.calculation.calculated_benefit_amount == correct_amount
+    assert handling_application.calculation.instalments.count() >= 1
+    assert sum(
+        instalment.amount
+        for instalment in handling_application.calculation.instalments.all()
+    ) == decimal.Decimal(correct_amount)
+
+
+def test_recalculate_calculations_date_range(handling_application):
+    _set_stale_amount(handling_application)
+    after_end_date = handling_application.calculation.end_date + timedelta(days=1)
+
+    out = StringIO()
+    call_command(
+        "recalculate_calculations",
+        "--start-date",
+        after_end_date.isoformat(),
+        stdout=out,
+    )
+
+    assert "Recalculated 0 calculations" in out.getvalue()
+
+
+def test_recalculate_calculations_invalid_status():
+    with pytest.raises(CommandError):
+        call_command("recalculate_calculations", "--status", "accepted")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_recalculate_calculations_in_worker_processes(
+    mock_get_organisation_roles_and_create_company,
+):
+    with factory.Faker.override_default_locale("fi_FI"):
+        applications = HandlingApplicationFactory.create_batch(
+            3, company=mock_get_organisation_roles_and_create_company
+        )
+    correct_amounts = [_set_stale_amount(application) for application in applications]
+
+    out = StringIO()
+    call_command(
+        "recalculate_calculations", "--workers", "2", "--chunk-size", "2", stdout=out
+    )
+
+    assert "Recalculated 3 calculations" in out.getvalue()
+    assert "3 calculated benefit amounts changed, 0 failed" in out.getvalue()
+    for application, correct_amount in zip(applications, correct_amounts):
+        application.calculation.refresh_from_db()
+        assert application.calculation.calculated_benefit_amount == correct_amount
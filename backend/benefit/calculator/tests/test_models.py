@@ -1,11 +1,14 @@
 from datetime import date
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from applications.enums import ApplicationStatus, BenefitType
 from applications.tests.conftest import *  # noqa
 from calculator.models import (
     Calculation,
+    CalculationRow,
     PaySubsidy,
     PreviousBenefit,
     TrainingCompensation,
@@ -250,3 +253,47 @@ def test_calculation_required_fields(
     else:
         assert handling_application.calculation.calculated_benefit_amount is None
         assert handling_application.calculation.rows.count() == 0
+
+
+def _calculate_with_pay_subsidies(application, pay_subsidy_percents):
+    application.status = ApplicationStatus.HANDLING
+    application.benefit_type = BenefitType.SALARY_BENEFIT
+    application.save()
+    application.pay_subsidies.all().delete()
+    application.calculation.start_date = date(2023, 1, 1)
+    application.calculation.end_date = date(2023, 12, 31)
+    application.calculation.state_aid_max_percentage = 50
+    application.calculation.save()
+    for index, pay_subsidy_percent in enumerate(pay_subsidy_percents):
+        PaySubsidy.objects.create(
+            application=application,
+            start_date=date(2023, 1 + index * 3, 1),
+            end_date=date(2023, 3 + index * 3, 28),
+            pay_subsidy_percent=pay_subsidy_percent,
+            work_time_percent=100,
+            ordering=index,
+        )
+
+    with CaptureQueriesContext(connection) as context:
+        application.calculation.calculate()
+    return len(context.captured_queries)
+
+
+def test_calculation_query_count_does_not_depend_on_row_count(handling_application):
+    single_range_queries = _calculate_with_pay_subsidies(handling_application, [50])
+    single_range_rows = handling_application.calculation.rows.count()
+    multi_range_queries = _calculate_with_pay_subsidies(
+        handling_application, [50, 70, 100, 50]
+    )
+    multi_range_rows = handling_application.calculation.rows.count()
+
+    assert multi_range_rows > single_range_rows
+    assert multi_range_queries == single_range_queries
+    assert handling_application.calculation.calculated_benefit_amount > 0
+
+    # History is written for both the removed and the created rows
+    row_history = CalculationRow.history.filter(
+        calculation=handling_application.calculation
+    )
+    assert row_history.filter(history_type="+").count() >= multi_range_rows
+    assert row_history.filter(history_type="-").count() >= single_range_rows
@@ -2,10 +2,12 @@ import decimal
 import functools
 import hashlib
 import itertools
+import re
 from datetime import date, timedelta
 from typing import Iterator, Tuple, Union
 
 from dateutil.relativedelta import relativedelta
+from django.conf import settings
 from django.core.files import File
 from django.http import HttpRequest
 from phonenumber_field.serializerfields import (
@@ -444,6 +446,35 @@ def hash_file(file: File) -> str:
     return sha256.hexdigest()
 
 
+NAME_TRIGRAM_HASH_LENGTH = 16
+
+
+def name_trigrams(value: str) -> set:
+    """Split a name into lowercase trigrams the same way as PostgreSQL pg_trgm does:
+    every word is padded with two spaces in front and one space at the end."""
+    trigrams = set()
+    for word in re.findall(r"\w+", str(value or "").lower()):
+        padded = f"  {word} "
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def hash_name_trigrams(*names: str) -> list:
+    """Return the sorted keyed hashes of all the trigrams of the given names.
+
+    Employee names are stored encrypted, so the trigrams are hashed with a secret key
+    before storing them in the database to allow index backed fuzzy name search
+    without storing the names in plain text.
+    """
+    trigrams = set().union(*(name_trigrams(name) for name in names))
+    return sorted(
+        hashlib.sha256(
+            (trigram + settings.EMPLOYEE_NAME_TRIGRAM_HASH_KEY).encode()
+        ).hexdigest()[:NAME_TRIGRAM_HASH_LENGTH]
+        for trigram in trigrams
+    )
+
+
 def get_request_ip_address(request: HttpRequest) -> Union[str, None]:
     """Get the IP address of a request"""
     x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
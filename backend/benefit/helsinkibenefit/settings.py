@@ -78,6 +78,10 @@ env = environ.Env(
         str,
         "af1b5a67d11197865a731c26bf9659716b9ded71c2802b4363856fe613b6b527",
     ),
+    EMPLOYEE_NAME_TRIGRAM_HASH_KEY=(
+        str,
+        "5d0c7fb3e9a4c2a16e5b8f1d07c34a9e2b6f8d1c4a7e0b3f6c9d2e5a8b1c4f70",
+    ),
     PREVIOUS_BENEFITS_SOCIAL_SECURITY_NUMBER_HASH_KEY=(
         str,
         "d5c8a2743d726a33dbd637fac39d6f0712dcee4af36142fb4fb15afa17b1d9bf",
@@ -204,6 +208,7 @@ SOCIAL_SECURITY_NUMBER_HASH_KEY = env.str("SOCIAL_SECURITY_NUMBER_HASH_KEY")
 
 EMPLOYEE_FIRST_NAME_HASH_KEY = env.str("EMPLOYEE_FIRST_NAME_HASH_KEY")
 EMPLOYEE_LAST_NAME_HASH_KEY = env.str("EMPLOYEE_LAST_NAME_HASH_KEY")
+EMPLOYEE_NAME_TRIGRAM_HASH_KEY = env.str("EMPLOYEE_NAME_TRIGRAM_HASH_KEY")
 
 PREVIOUS_BENEFITS_SOCIAL_SECURITY_NUMBER_HASH_KEY = env.str(
     "PREVIOUS_BENEFITS_SOCIAL_SECURITY_NUMBER_HASH_KEY"
@@ -150,6 +150,11 @@ urlpatterns = [
         "v1/handlerinstalments/<str:instalment_id>/",
         calculator_views.InstalmentView.as_view(),
     ),
+    path(
+        "v1/handlerapplications/<str:application_id>/calculation_preview/",
+        calculator_views.CalculationPreviewView.as_view(),
+        name="handler-calculation-preview",
+    ),
     path(
         "v1/handlerapplications/<str:application_id>/decisions/",
         DecisionTextList.as_view(),